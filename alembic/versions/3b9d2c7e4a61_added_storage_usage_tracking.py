@@ -0,0 +1,32 @@
+"""Added storage usage tracking
+
+Revision ID: 3b9d2c7e4a61
+Revises: 1056a38b7b46
+Create Date: 2026-10-19 10:12:41.508312
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '3b9d2c7e4a61'
+down_revision = '1056a38b7b46'
+branch_labels = None
+depends_on = None
+
+
+def upgrade() -> None:
+    op.add_column('files', sa.Column('size_bytes', sa.BigInteger(), nullable=True))
+    op.create_table('user_storage_usage',
+    sa.Column('user_id', sa.Integer(), nullable=False),
+    sa.Column('bytes_used', sa.BigInteger(), nullable=False),
+    sa.Column('file_count', sa.Integer(), nullable=False),
+    sa.ForeignKeyConstraint(['user_id'], ['users.id'], ),
+    sa.PrimaryKeyConstraint('user_id')
+    )
+
+
+def downgrade() -> None:
+    op.drop_table('user_storage_usage')
+    op.drop_column('files', 'size_bytes')
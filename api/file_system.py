@@ -1,13 +1,29 @@
-from fastapi.responses import FileResponse
+from fastapi.responses import FileResponse, JSONResponse
 from fastapi import APIRouter, FastAPI, Depends, HTTPException, UploadFile, File
+from starlette.concurrency import run_in_threadpool
+from starlette.datastructures import Headers, QueryParams
 import os
+import tempfile
 
 from sqlalchemy.orm import Session
-from models import Files, User, UserRole
+from models import Files, User, UserRole, UserStorageUsage
 
 from utils import generate_encrypted_url  
+from storage_utils import (
+    STORAGE_QUOTA_BYTES,
+    STORAGE_QUOTA_FILES,
+    UPLOAD_DIRECTORY,
+    check_storage_quota,
+    get_storage_usage,
+    record_deletion,
+    record_upload,
+)
 from database import SessionLocal
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+# Upper bound for what a multipart request adds around the file: boundaries, part headers and the filename
+MULTIPART_FRAMING_ALLOWANCE = 8 * 1024
+
 def get_db():
     """
     Session Management:
@@ -23,6 +39,58 @@ def get_db():
         db.close()
 
 
+def _check_declared_upload_size(email: str, content_length: int):
+    """
+    Check the declared size of an upload against the user's quota using the usage counters only.
+
+    The multipart framing allowance is subtracted from the declared length, so only requests that
+    are certainly over quota are rejected here and near-boundary uploads reach the exact check.
+    """
+    db = SessionLocal()
+    try:
+        current_user = db.query(User).filter(User.email == email).first()
+        # Other users are rejected by upload_file itself, with the proper status code
+        if not current_user or current_user.role != UserRole.OPS_USER:
+            return
+        usage = db.query(UserStorageUsage).filter(UserStorageUsage.user_id == current_user.id).first()
+        check_storage_quota(usage or UserStorageUsage(bytes_used=0, file_count=0),
+                            max(content_length - MULTIPART_FRAMING_ALLOWANCE, 0))
+    finally:
+        db.close()
+
+
+class UploadQuotaMiddleware:
+    """
+    Reject uploads that cannot fit in the user's quota before the request body is read.
+
+    FastAPI reads the whole multipart body before the endpoint runs, so this check lives in an
+    ASGI middleware and relies on the Content-Length header. The header also counts the multipart
+    framing, so a fixed allowance is granted for it; upload_file enforces the exact limit.
+    Every other request is passed straight through to the application.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if (scope["type"] != "http" or scope["method"] != "POST"
+                or not scope["path"].endswith("/upload-file")):
+            await self.app(scope, receive, send)
+            return
+
+        content_length = Headers(scope=scope).get("content-length")
+        email = QueryParams(scope["query_string"]).get("email")
+        if email and content_length and content_length.isdigit():
+            try:
+                await run_in_threadpool(_check_declared_upload_size, email, int(content_length))
+            except HTTPException as exc:
+                response = JSONResponse(status_code=exc.status_code, content={"detail": exc.detail})
+                await response(scope, receive, send)
+                return
+
+        await self.app(scope, receive, send)
+
+
 app = APIRouter()
 
 @app.post("/upload-file")
@@ -32,6 +100,7 @@ async def upload_file(email:str, file: UploadFile = File(...), db: Session = Dep
 
     This endpoint allows an Ops User to upload files with specific file types (docx, xlsx, pptx).
     It validates the user’s role and file type, saves the file, and stores an encrypted URL in the database.
+    The user's storage usage counters are updated in the same transaction as the file record.
 
     Parameters:
         email (str): Email of the user uploading the file.
@@ -42,6 +111,7 @@ async def upload_file(email:str, file: UploadFile = File(...), db: Session = Dep
         dict: Success message and the encrypted URL of the uploaded file.
         HTTPException: 403 status code if the user is not authorized.
         HTTPException: 400 status code if the file type is invalid.
+        HTTPException: 413 status code if the file does not fit in the user's quota.
     """
     
     # Check if the current user is an client user
@@ -57,27 +127,56 @@ async def upload_file(email:str, file: UploadFile = File(...), db: Session = Dep
     ]:
         raise HTTPException(status_code=400, detail="Only pptx, docx, and xlsx files are allowed.")
 
-    UPLOAD_DIRECTORY = "/tmp/path/to/your/files/"
+    # Fail fast on the file count quota before writing anything to disk
+    usage = get_storage_usage(db, current_user.id)
+    check_storage_quota(usage)
+    # Keep the counters readable without a refresh and release the transaction while the file is written
+    db.expunge(usage)
+    db.commit()
+
     if not os.path.exists(UPLOAD_DIRECTORY):
         os.makedirs(UPLOAD_DIRECTORY)
     
     file_location = f"{UPLOAD_DIRECTORY}{file.filename}"
     
-    with open(file_location, "wb+") as file_object:
-        file_object.write(await file.read())
-
-    # Generate an encrypted URL for the uploaded file
-    encrypted_url = generate_encrypted_url(file.filename)
-
-    # Save the encrypted URL in the database
-    # Assuming you have a File model to save the details
-    new_file_entry = Files(
-        file_name=file.filename,
-        encrypted_url=encrypted_url,
-        user_id=current_user.id  
-    )
-    db.add(new_file_entry)
-    db.commit()
+    # Write the file in chunks to a temporary file, so an upload going over the byte quota is stopped
+    # early and a failed upload never touches a file already stored under the same name
+    size_bytes = 0
+    temp_file = tempfile.NamedTemporaryFile(dir=UPLOAD_DIRECTORY, delete=False)
+    try:
+        with temp_file:
+            while True:
+                chunk = await file.read(UPLOAD_CHUNK_SIZE)
+                if not chunk:
+                    break
+                size_bytes += len(chunk)
+                check_storage_quota(usage, size_bytes)
+                temp_file.write(chunk)
+
+        # Generate an encrypted URL for the uploaded file
+        encrypted_url = generate_encrypted_url(file.filename)
+
+        # Lock the usage row and re-check the quota, other uploads may have committed meanwhile
+        usage = get_storage_usage(db, current_user.id, lock=True)
+        check_storage_quota(usage, size_bytes)
+
+        # Save the encrypted URL in the database together with the updated usage counters
+        new_file_entry = Files(
+            file_name=file.filename,
+            encrypted_url=encrypted_url,
+            user_id=current_user.id,
+            size_bytes=size_bytes
+        )
+        db.add(new_file_entry)
+        record_upload(usage, size_bytes)
+        db.commit()
+    except Exception:
+        db.rollback()
+        os.remove(temp_file.name)
+        raise
+
+    # Only move the file into place once its record is committed
+    os.replace(temp_file.name, file_location)
     db.refresh(new_file_entry)
 
     return {"detail": "File uploaded successfully!", "encrypted_url": encrypted_url}
@@ -108,7 +207,7 @@ async def download_file(email: str, file_id: int, db: Session = Depends(get_db))
     if file_entry.user.role == UserRole.OPS_USER:
         raise HTTPException(status_code=403, detail="You are not authorized to download files.")
 
-    file_path = os.path.join("/tmp/path/to/your/files/", file_entry.file_name)
+    file_path = os.path.join(UPLOAD_DIRECTORY, file_entry.file_name)
     
     if not os.path.isfile(file_path):
         raise HTTPException(status_code=404, detail="File not found.")
@@ -139,4 +238,81 @@ async def list_files(email: str, db: Session = Depends(get_db)):
     # Query the database for all files
     files = db.query(Files).all()
     
-    return files 
+    return files
+
+
+@app.delete("/delete-file/{file_id}")
+async def delete_file(email: str, file_id: int, db: Session = Depends(get_db)):
+    """
+    Delete a file uploaded by an ops user.
+
+    This endpoint allows an Ops User to delete one of their own files. The file record and the
+    user's storage usage counters are updated in the same transaction, then the file is removed from disk.
+
+    Parameters:
+        email (str): Email of the user deleting the file.
+        file_id (int): ID of the file to be deleted.
+        db (Session): Database session dependency.
+
+    Returns:
+        dict: Success message.
+        HTTPException: 403 status code if the user is not authorized.
+        HTTPException: 404 status code if the file is not found.
+    """
+    current_user = db.query(User).filter(User.email == email).first()
+    if current_user.role == UserRole.CLIENT_USER:
+        raise HTTPException(status_code=403, detail="You are not authorized to delete files.")
+
+    # Lock the usage row before reading the file row, so concurrent deletes of the same file are
+    # serialised and only the first one finds the row and decrements the counters
+    usage = get_storage_usage(db, current_user.id, lock=True)
+    file_entry = (
+        db.query(Files)
+        .filter(Files.id == file_id, Files.user_id == current_user.id)
+        .with_for_update()
+        .first()
+    )
+    if not file_entry:
+        db.rollback()
+        raise HTTPException(status_code=404, detail="File not found.")
+
+    file_path = os.path.join(UPLOAD_DIRECTORY, file_entry.file_name)
+
+    record_deletion(usage, file_entry.size_bytes or 0)
+    db.delete(file_entry)
+    db.commit()
+
+    if os.path.isfile(file_path):
+        os.remove(file_path)
+
+    return {"detail": "File deleted successfully!"}
+
+
+@app.get("/storage-usage")
+async def storage_usage(email: str, db: Session = Depends(get_db)):
+    """
+    Get the storage usage of an ops user.
+
+    This endpoint reads the incrementally maintained usage counters of the user, so it does not
+    scan the files table or the upload directory.
+
+    Parameters:
+        email (str): Email of the user requesting their usage.
+        db (Session): Database session dependency.
+
+    Returns:
+        dict: Bytes used, file count and the configured quotas.
+        HTTPException: 403 status code if the user is not authorized.
+    """
+    current_user = db.query(User).filter(User.email == email).first()
+    if current_user.role == UserRole.CLIENT_USER:
+        raise HTTPException(status_code=403, detail="You are not authorized to view storage usage.")
+
+    usage = db.query(UserStorageUsage).filter(UserStorageUsage.user_id == current_user.id).first()
+
+    return {
+        "bytes_used": usage.bytes_used if usage else 0,
+        "file_count": usage.file_count if usage else 0,
+        "quota_bytes": STORAGE_QUOTA_BYTES,
+        "quota_files": STORAGE_QUOTA_FILES,
+    }
@@ -0,0 +1,49 @@
+from fastapi import APIRouter, HTTPException, Request, status
+from sqlalchemy import text
+from sqlalchemy.exc import SQLAlchemyError
+
+from database import init_engine
+
+
+app = APIRouter()
+
+
+@app.get('/live')
+async def liveness():
+    """
+    Liveness probe.
+
+    This endpoint only tells that the worker process is up and its event loop is responsive.
+    It does not touch the database, so a database outage does not get the worker restarted.
+
+    Returns:
+        dict: Status of the worker.
+    """
+    return {"status": "alive"}
+
+
+@app.get('/ready')
+def readiness(request: Request):
+    """
+    Readiness probe.
+
+    This endpoint tells whether the worker can serve traffic: the warm-up must have completed
+    and the database must answer a trivial query. If the warm-up failed at startup, it is retried here.
+
+    Parameters:
+        request (Request): Incoming request, used to read the application state.
+
+    Returns:
+        dict: Status of the worker.
+        HTTPException: 503 status code if the warm-up has failed or the database is unreachable.
+    """
+    if not request.app.state.ready and not request.app.state.warm_up():
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Worker is not ready, warm-up has not succeeded yet.")
+
+    try:
+        with init_engine().connect() as connection:
+            connection.execute(text("SELECT 1"))
+    except SQLAlchemyError:
+        raise HTTPException(status_code=status.HTTP_503_SERVICE_UNAVAILABLE, detail="Database is unreachable.")
+
+    return {"status": "ready"}
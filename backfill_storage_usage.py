@@ -0,0 +1,71 @@
+import os
+
+from dotenv import load_dotenv
+from sqlalchemy import func, text
+
+from database import SessionLocal, init_engine
+from models import Files, UserStorageUsage
+from storage_utils import UPLOAD_DIRECTORY
+
+
+def backfill_file_sizes(db) -> int:
+    """
+    Fill in the size of files uploaded before sizes were recorded.
+
+    Every files row without a size is measured with stat() on the upload directory.
+    Files missing from disk are recorded with a size of 0.
+
+    Parameters:
+        db (Session): Database session.
+
+    Returns:
+        int: Number of file rows updated.
+    """
+    updated = 0
+    for file_entry in db.query(Files).filter(Files.size_bytes.is_(None)).yield_per(500):
+        file_path = os.path.join(UPLOAD_DIRECTORY, file_entry.file_name)
+        file_entry.size_bytes = os.path.getsize(file_path) if os.path.isfile(file_path) else 0
+        updated += 1
+    return updated
+
+
+def rebuild_storage_usage(db) -> int:
+    """
+    Recompute the storage usage counters of every user from the files table.
+
+    The usage table is locked for the duration of the transaction, so uploads and deletions
+    running at the same time wait for the rebuild and then apply on top of the new counters.
+
+    Parameters:
+        db (Session): Database session.
+
+    Returns:
+        int: Number of users with a usage row after the rebuild.
+    """
+    db.execute(text("LOCK TABLE user_storage_usage IN EXCLUSIVE MODE"))
+    totals = (
+        db.query(Files.user_id, func.coalesce(func.sum(Files.size_bytes), 0), func.count(Files.id))
+        .filter(Files.user_id.isnot(None))
+        .group_by(Files.user_id)
+        .all()
+    )
+    db.query(UserStorageUsage).delete(synchronize_session=False)
+    db.bulk_save_objects([
+        UserStorageUsage(user_id=user_id, bytes_used=bytes_used, file_count=file_count)
+        for user_id, bytes_used, file_count in totals
+    ])
+    return len(totals)
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    init_engine()
+    db = SessionLocal()
+    try:
+        files_updated = backfill_file_sizes(db)
+        db.commit()
+        users_updated = rebuild_storage_usage(db)
+        db.commit()
+    finally:
+        db.close()
+    print(f"Backfilled {files_updated} file sizes and rebuilt storage usage for {users_updated} users.")
@@ -1,7 +1,13 @@
-from api import login, signup, file_system
-from database import SessionLocal
+import logging
+import threading
+import time
+
+from dotenv import load_dotenv
 from fastapi import APIRouter, FastAPI
 
+logger = logging.getLogger("uvicorn.error")
+
+
 def get_db():
     """
     Session Management:
@@ -10,19 +16,132 @@ def get_db():
     (usually within the scope of an API request), the session is closed (db.close()),
     ensuring that resources are properly released.
     """
+    from database import SessionLocal
+
     db = SessionLocal()
     try:
         yield db
     finally:
         db.close()
 
-app = FastAPI(title="File Sharing System")
-api_router = APIRouter()
 
-# Include the routers from login, signup, and file_system into the api_router
-api_router.include_router(signup.app, tags=['SIGNUP'], prefix="/api/v1")
-api_router.include_router(login.app, tags=['LOGIN'], prefix="/api/v1")
-api_router.include_router(file_system.app, tags=['FILE SYSTEM'], prefix="/file_system")
+def prime_query_cache():
+    """
+    Compile the queries used on the hot paths once so the first requests hit SQLAlchemy's
+    statement cache instead of configuring mappers and compiling SQL.
+    """
+    from sqlalchemy.orm import configure_mappers
+    from database import SessionLocal
+    from models import Files, User, UserStorageUsage
+
+    configure_mappers()
+    db = SessionLocal()
+    try:
+        db.query(User).filter(User.email == "").first()
+        db.query(Files).filter(Files.id == 0).first()
+        db.query(UserStorageUsage).filter(UserStorageUsage.user_id == 0).first()
+    finally:
+        db.close()
+
+
+def create_app() -> FastAPI:
+    """
+    Build the FastAPI application.
+
+    Loading the environment and importing the routers happens here rather than at module import,
+    and the database engine, SMTP client and upload storage are only initialised by the startup
+    handler. The handler also warms the worker up (pool connections, query cache) before uvicorn
+    lets it accept traffic, and marks the app as ready for the readiness probe. If the warm-up
+    fails, the worker still starts but stays not ready until a later warm-up succeeds.
+
+    Returns:
+        FastAPI: The configured application.
+    """
+    started_at = time.perf_counter()
+    load_dotenv()
+
+    from api import file_system, health, login, signup
+    from database import dispose_engine, init_engine, warm_up_engine
+    from storage_utils import init_storage
+    from utils import init_smtp
+
+    app = FastAPI(title="File Sharing System")
+    app.state.ready = False
+    # Reject uploads over the user's storage quota before their body is read
+    app.add_middleware(file_system.UploadQuotaMiddleware)
+
+    api_router = APIRouter()
+
+    # Include the routers from login, signup, and file_system into the api_router
+    api_router.include_router(signup.app, tags=['SIGNUP'], prefix="/api/v1")
+    api_router.include_router(login.app, tags=['LOGIN'], prefix="/api/v1")
+    api_router.include_router(file_system.app, tags=['FILE SYSTEM'], prefix="/file_system")
+    api_router.include_router(health.app, tags=['HEALTH'], prefix="/health")
+
+    # Include the api_router into the main app
+    app.include_router(api_router)
+
+    warm_up_lock = threading.Lock()
+    warm_up_failures = 0
+
+    def warm_up() -> bool:
+        """
+        Initialise the engine, SMTP client and storage, then warm the worker up.
+
+        A failure is logged and leaves the app not ready instead of crashing the worker, since the
+        multiprocess supervisor does not respawn it. The readiness probe retries the warm-up; a probe
+        arriving while a retry is already running does not start another one and reports not ready.
+        """
+        nonlocal warm_up_failures
+        if not warm_up_lock.acquire(blocking=False):
+            return False
+        try:
+            if app.state.ready:
+                return True
+            warm_up_started_at = time.perf_counter()
+            try:
+                init_engine()
+                init_smtp()
+                init_storage()
+                connections = warm_up_engine()
+                prime_query_cache()
+            except Exception as exc:
+                # Only the first failure gets a traceback, retries from the readiness probe would flood the log
+                if warm_up_failures == 0:
+                    logger.exception("Worker warm-up failed, /health/ready will report 503 until it succeeds")
+                else:
+                    logger.warning("Worker warm-up retry failed: %s", exc)
+                warm_up_failures += 1
+                return False
+            app.state.ready = True
+            logger.info(
+                "Worker ready: app built in %.0f ms, warm-up (%d DB connections) took %.0f ms",
+                (warm_up_started_at - started_at) * 1000,
+                connections,
+                (time.perf_counter() - warm_up_started_at) * 1000,
+            )
+            return True
+        finally:
+            warm_up_lock.release()
+
+    app.state.warm_up = warm_up
+
+    @app.on_event("startup")
+    def startup():
+        warm_up()
+
+    @app.on_event("shutdown")
+    def shutdown():
+        app.state.ready = False
+        dispose_engine()
+
+    return app
+
 
-# Include the api_router into the main app
-app.include_router(api_router)
+def __getattr__(name):
+    # Keep "uvicorn main:app" working while only building the app when it is actually asked for,
+    # "uvicorn main:create_app --factory" (see serve.py) skips this entirely.
+    if name == "app":
+        globals()["app"] = create_app()
+        return globals()["app"]
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
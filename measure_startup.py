@@ -0,0 +1,52 @@
+import os
+import subprocess
+import sys
+import time
+from urllib.error import URLError
+from urllib.request import urlopen
+
+PORT = int(os.getenv("SERVER_PORT", 8000))
+READY_URL = f"http://127.0.0.1:{PORT}/health/ready"
+TIMEOUT = 60
+
+
+def measure_import_time() -> float:
+    """
+    Measure how long a fresh interpreter takes to import main and build the app.
+
+    Returns:
+        float: Cold-start time in milliseconds.
+    """
+    code = "import time; t = time.perf_counter(); import main; main.create_app(); print((time.perf_counter() - t) * 1000)"
+    output = subprocess.run([sys.executable, "-c", code], check=True, capture_output=True, text=True)
+    return float(output.stdout.strip().splitlines()[-1])
+
+
+def measure_time_to_first_request() -> float:
+    """
+    Start the production profile with a single worker and poll the readiness probe.
+
+    Returns:
+        float: Time from process start to the first successful readiness response, in milliseconds.
+    """
+    env = dict(os.environ, WEB_CONCURRENCY="1", SERVER_PORT=str(PORT))
+    started_at = time.perf_counter()
+    server = subprocess.Popen([sys.executable, "serve.py"], env=env)
+    try:
+        while time.perf_counter() - started_at < TIMEOUT:
+            try:
+                with urlopen(READY_URL, timeout=1) as response:
+                    if response.status == 200:
+                        return (time.perf_counter() - started_at) * 1000
+            except (URLError, ConnectionError):
+                pass
+            time.sleep(0.01)
+        raise RuntimeError(f"{READY_URL} did not become ready within {TIMEOUT} seconds.")
+    finally:
+        server.terminate()
+        server.wait()
+
+
+if __name__ == "__main__":
+    print(f"Cold start (import + create_app): {measure_import_time():.0f} ms")
+    print(f"Time to first request (process start -> /health/ready 200): {measure_time_to_first_request():.0f} ms")
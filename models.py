@@ -1,6 +1,6 @@
 from database import Base
 from enum import Enum
-from sqlalchemy import String, Integer, Boolean, Column, ForeignKey, Enum as SQLalchemyEnum
+from sqlalchemy import String, Integer, BigInteger, Boolean, Column, ForeignKey, Enum as SQLalchemyEnum
 from sqlalchemy.orm import relationship
 
 class UserRole(str, Enum):
@@ -24,6 +24,17 @@ class Files(Base):
     file_name = Column(String)
     encrypted_url = Column(String, unique=True)
     user_id = Column(Integer, ForeignKey(User.id))
+    # Size of the stored file in bytes. NULL only for rows uploaded before sizes were tracked,
+    # until backfill_storage_usage.py has been run.
+    size_bytes = Column(BigInteger, nullable=True)
+    user = relationship('User')
+
+
+class UserStorageUsage(Base):
+    # One row per ops user, kept in step with the files table inside the same transaction
+    # as every upload/deletion so usage can be read without scanning files or the disk.
+    __tablename__ = "user_storage_usage"
+    user_id = Column(Integer, ForeignKey(User.id), primary_key=True)
+    bytes_used = Column(BigInteger, nullable=False, default=0)
+    file_count = Column(Integer, nullable=False, default=0)
     user = relationship('User')
-     
-    
\ No newline at end of file
@@ -0,0 +1,52 @@
+import os
+
+import uvicorn
+from dotenv import load_dotenv
+
+# Load .env before reading the settings below, the workers' create_app() reads the same file
+load_dotenv()
+
+# Production server profile. Every setting can be overridden through the environment.
+HOST = os.getenv("SERVER_HOST", "0.0.0.0")
+PORT = int(os.getenv("SERVER_PORT", 8000))
+# Total number of database connections all workers together may open. Each worker can open up to
+# DB_POOL_SIZE + DB_MAX_OVERFLOW connections; the default budget stays under Postgres's default
+# max_connections=100 and leaves room for migrations, backfills and psql sessions.
+DB_CONNECTION_BUDGET = int(os.getenv("DB_CONNECTION_BUDGET", 90))
+DB_CONNECTIONS_PER_WORKER = int(os.getenv("DB_POOL_SIZE", 5)) + int(os.getenv("DB_MAX_OVERFLOW", 10))
+
+
+def default_workers() -> int:
+    """
+    One worker per usable core, capped by the database connection budget.
+
+    The workers are async, so more processes than cores only adds contention. The cores are read
+    from the CPU affinity of the process rather than os.cpu_count(), which reports every core of the host.
+    """
+    if hasattr(os, "sched_getaffinity"):
+        cores = len(os.sched_getaffinity(0))
+    else:
+        cores = os.cpu_count() or 1
+    return max(min(cores, DB_CONNECTION_BUDGET // DB_CONNECTIONS_PER_WORKER), 1)
+
+
+WORKERS = int(os.getenv("WEB_CONCURRENCY", default_workers()))
+LOOP = os.getenv("SERVER_LOOP", "uvloop")
+HTTP = os.getenv("SERVER_HTTP", "httptools")
+LOG_LEVEL = os.getenv("SERVER_LOG_LEVEL", "info")
+ACCESS_LOG = os.getenv("SERVER_ACCESS_LOG", "true").lower() in ("1", "true", "yes")
+
+
+if __name__ == "__main__":
+    uvicorn.run(
+        "main:create_app",
+        factory=True,
+        host=HOST,
+        port=PORT,
+        workers=WORKERS,
+        loop=LOOP,
+        http=HTTP,
+        log_level=LOG_LEVEL,
+        access_log=ACCESS_LOG,
+        proxy_headers=True,
+    )
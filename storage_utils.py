@@ -0,0 +1,91 @@
+import os
+
+from fastapi import HTTPException, status
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlalchemy.orm import Session
+
+from models import UserStorageUsage
+
+UPLOAD_DIRECTORY = "/tmp/path/to/your/files/"
+
+# Per-user quotas, configurable through the environment. Defaults: 100 MB and 1000 files.
+STORAGE_QUOTA_BYTES = int(os.getenv("STORAGE_QUOTA_BYTES", 100 * 1024 * 1024))
+STORAGE_QUOTA_FILES = int(os.getenv("STORAGE_QUOTA_FILES", 1000))
+
+
+def init_storage():
+    """
+    Make sure the upload directory exists before the worker starts serving uploads.
+    """
+    os.makedirs(UPLOAD_DIRECTORY, exist_ok=True)
+
+
+def get_storage_usage(db: Session, user_id: int, lock: bool = False) -> UserStorageUsage:
+    """
+    Fetch the storage usage row of a user, creating it if it does not exist yet.
+
+    The row is created with INSERT ... ON CONFLICT DO NOTHING so two first uploads of the
+    same user running concurrently cannot fail on the primary key. SQLite, used by the test
+    suite, supports the same clause.
+
+    Parameters:
+        db (Session): Database session.
+        user_id (int): ID of the user.
+        lock (bool): Take a row lock (SELECT ... FOR UPDATE) so the counters can be
+            updated safely until the transaction is committed.
+
+    Returns:
+        UserStorageUsage: The usage row of the user.
+    """
+    insert = sqlite.insert if db.get_bind().dialect.name == "sqlite" else postgresql.insert
+    db.execute(
+        insert(UserStorageUsage)
+        .values(user_id=user_id, bytes_used=0, file_count=0)
+        .on_conflict_do_nothing(index_elements=[UserStorageUsage.user_id])
+    )
+    query = db.query(UserStorageUsage).filter(UserStorageUsage.user_id == user_id)
+    if lock:
+        query = query.with_for_update()
+    return query.one()
+
+
+def check_storage_quota(usage: UserStorageUsage, incoming_bytes: int = 0):
+    """
+    Check that a new file of the given size fits in the user's quota.
+
+    Parameters:
+        usage (UserStorageUsage): Current usage of the user.
+        incoming_bytes (int): Size of the file about to be stored.
+
+    Raises:
+        HTTPException: 413 status code if the file count or byte quota would be exceeded.
+    """
+    if usage.file_count + 1 > STORAGE_QUOTA_FILES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="File count quota exceeded. Delete some files before uploading new ones.")
+
+    if usage.bytes_used + incoming_bytes > STORAGE_QUOTA_BYTES:
+        raise HTTPException(status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+                    detail="Storage quota exceeded. Delete some files before uploading new ones.")
+
+
+def record_upload(usage: UserStorageUsage, size_bytes: int):
+    """
+    Add an uploaded file to the user's usage counters.
+
+    The caller is responsible for committing, so the counters and the files row
+    are written in the same transaction.
+    """
+    usage.bytes_used += size_bytes
+    usage.file_count += 1
+
+
+def record_deletion(usage: UserStorageUsage, size_bytes: int):
+    """
+    Remove a deleted file from the user's usage counters.
+
+    The caller is responsible for committing, so the counters and the files row
+    are written in the same transaction.
+    """
+    usage.bytes_used = max(usage.bytes_used - size_bytes, 0)
+    usage.file_count = max(usage.file_count - 1, 0)
@@ -0,0 +1,120 @@
+import os
+import subprocess
+import sys
+import threading
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+from sqlalchemy.exc import OperationalError
+
+import database
+import serve
+import storage_utils
+from database import Base, SessionLocal
+from main import create_app
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+@pytest.fixture
+def db_engine(tmp_path, monkeypatch):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    # init_engine() returns the already created engine instead of connecting to Postgres
+    monkeypatch.setattr(database, "engine", engine)
+    monkeypatch.setattr(storage_utils, "UPLOAD_DIRECTORY", f"{tmp_path / 'files'}/")
+    SessionLocal.configure(bind=engine)
+    yield engine
+    SessionLocal.configure(bind=None)
+    engine.dispose()
+
+
+@pytest.fixture
+def failing_warm_up(monkeypatch):
+    """
+    Replace the pool warm-up with one that fails until state["fail"] is set to False.
+    """
+    state = {"fail": True, "calls": 0}
+
+    def warm_up_engine():
+        state["calls"] += 1
+        if state["fail"]:
+            raise OperationalError("SELECT 1", {}, Exception("could not connect to server"))
+        return 1
+
+    monkeypatch.setattr(database, "warm_up_engine", warm_up_engine)
+    return state
+
+
+def test_import_main_is_lightweight():
+    code = (
+        "import sys, main, database; "
+        "assert not [name for name in sys.modules if name == 'api' or name.startswith('api.')]; "
+        "assert database.engine is None"
+    )
+    subprocess.run([sys.executable, "-c", code], cwd=REPO_ROOT, check=True)
+
+
+def test_liveness_does_not_need_database():
+    # Without the context manager the startup warm-up does not run and no engine exists
+    client = TestClient(create_app())
+    response = client.get("/health/live")
+    assert response.status_code == 200
+    assert response.json() == {"status": "alive"}
+
+
+def test_readiness_after_failed_and_retried_warm_up(db_engine, failing_warm_up):
+    with TestClient(create_app()) as client:
+        assert failing_warm_up["calls"] == 1
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+        assert failing_warm_up["calls"] == 2
+
+        failing_warm_up["fail"] = False
+        response = client.get("/health/ready")
+        assert response.status_code == 200
+        assert response.json() == {"status": "ready"}
+
+        # Once ready the warm-up is not run again
+        client.get("/health/ready")
+        assert failing_warm_up["calls"] == 3
+
+
+def test_readiness_does_not_start_a_second_warm_up(db_engine, monkeypatch):
+    started, release = threading.Event(), threading.Event()
+
+    def slow_warm_up_engine():
+        started.set()
+        release.wait(5)
+        return 1
+
+    monkeypatch.setattr(database, "warm_up_engine", slow_warm_up_engine)
+    app = create_app()
+    client = TestClient(app)
+
+    retry = threading.Thread(target=app.state.warm_up)
+    retry.start()
+    try:
+        assert started.wait(5)
+        response = client.get("/health/ready")
+        assert response.status_code == 503
+    finally:
+        release.set()
+        retry.join()
+    assert client.get("/health/ready").status_code == 200
+
+
+@pytest.mark.parametrize("cores, budget, expected", [
+    (64, 90, 6),
+    (4, 90, 4),
+    (64, 10, 1),
+])
+def test_default_workers_stays_within_db_budget(monkeypatch, cores, budget, expected):
+    monkeypatch.setattr(os, "sched_getaffinity", lambda pid: set(range(cores)), raising=False)
+    monkeypatch.setattr(serve, "DB_CONNECTION_BUDGET", budget)
+    monkeypatch.setattr(serve, "DB_CONNECTIONS_PER_WORKER", 15)
+
+    workers = serve.default_workers()
+    assert workers == expected
+    assert workers <= max(budget // 15, 1)
@@ -0,0 +1,204 @@
+import os
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine
+
+import storage_utils
+from api import file_system
+from database import Base, SessionLocal
+from main import create_app
+from models import Files, User, UserRole, UserStorageUsage
+from storage_utils import check_storage_quota, get_storage_usage, record_deletion, record_upload
+
+DOCX = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
+OPS_EMAIL = "ops@example.com"
+CLIENT_EMAIL = "client@example.com"
+
+
+@pytest.fixture
+def db(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'test.db'}", connect_args={"check_same_thread": False})
+    Base.metadata.create_all(engine)
+    SessionLocal.configure(bind=engine)
+    session = SessionLocal()
+    session.add_all([
+        User(email=OPS_EMAIL, hashed_password="", role=UserRole.OPS_USER, is_verified=True),
+        User(email=CLIENT_EMAIL, hashed_password="", role=UserRole.CLIENT_USER, is_verified=True),
+    ])
+    session.commit()
+    yield session
+    session.close()
+    SessionLocal.configure(bind=None)
+    engine.dispose()
+
+
+@pytest.fixture
+def upload_dir(tmp_path, monkeypatch):
+    directory = tmp_path / "files"
+    directory.mkdir()
+    monkeypatch.setattr(file_system, "UPLOAD_DIRECTORY", f"{directory}/")
+    return directory
+
+
+@pytest.fixture
+def client(db, upload_dir):
+    # Startup handlers (engine creation, warm-up) are not run without the context manager
+    return TestClient(create_app())
+
+
+def upload(client, name, content, email=OPS_EMAIL):
+    return client.post(
+        "/file_system/upload-file",
+        params={"email": email},
+        files={"file": (name, content, DOCX)},
+    )
+
+
+def usage_of(db, email=OPS_EMAIL):
+    db.expire_all()
+    user = db.query(User).filter(User.email == email).one()
+    usage = db.query(UserStorageUsage).filter(UserStorageUsage.user_id == user.id).first()
+    return (usage.bytes_used, usage.file_count) if usage else (0, 0)
+
+
+def test_get_storage_usage_creates_row_once(db):
+    user = db.query(User).filter(User.email == OPS_EMAIL).one()
+    first = get_storage_usage(db, user.id)
+    second = get_storage_usage(db, user.id, lock=True)
+    assert first is second
+    assert (second.bytes_used, second.file_count) == (0, 0)
+    assert db.query(UserStorageUsage).count() == 1
+
+
+def test_record_upload_and_deletion():
+    usage = UserStorageUsage(bytes_used=0, file_count=0)
+    record_upload(usage, 10)
+    record_upload(usage, 5)
+    assert (usage.bytes_used, usage.file_count) == (15, 2)
+    record_deletion(usage, 10)
+    assert (usage.bytes_used, usage.file_count) == (5, 1)
+
+
+def test_check_storage_quota_limits(monkeypatch):
+    monkeypatch.setattr(storage_utils, "STORAGE_QUOTA_BYTES", 100)
+    monkeypatch.setattr(storage_utils, "STORAGE_QUOTA_FILES", 2)
+
+    check_storage_quota(UserStorageUsage(bytes_used=60, file_count=1), 40)
+
+    with pytest.raises(HTTPException) as exc:
+        check_storage_quota(UserStorageUsage(bytes_used=60, file_count=1), 41)
+    assert exc.value.status_code == 413
+
+    with pytest.raises(HTTPException) as exc:
+        check_storage_quota(UserStorageUsage(bytes_used=0, file_count=2))
+    assert exc.value.status_code == 413
+
+
+def test_upload_and_delete_update_usage(client, db, upload_dir):
+    response = upload(client, "report.docx", b"x" * 10)
+    assert response.status_code == 200
+    upload(client, "other.docx", b"y" * 5)
+    assert usage_of(db) == (15, 2)
+    assert (upload_dir / "report.docx").read_bytes() == b"x" * 10
+
+    response = client.get("/file_system/storage-usage", params={"email": OPS_EMAIL})
+    assert response.json()["bytes_used"] == 15
+    assert response.json()["file_count"] == 2
+
+    file_id = db.query(Files).filter(Files.file_name == "report.docx").one().id
+    response = client.delete(f"/file_system/delete-file/{file_id}", params={"email": OPS_EMAIL})
+    assert response.status_code == 200
+    assert usage_of(db) == (5, 1)
+    assert not (upload_dir / "report.docx").exists()
+
+    # A second delete of the same file must not decrement the counters again
+    response = client.delete(f"/file_system/delete-file/{file_id}", params={"email": OPS_EMAIL})
+    assert response.status_code == 404
+    assert usage_of(db) == (5, 1)
+
+
+def test_declared_length_over_byte_quota_is_rejected_before_upload(client, db, upload_dir, monkeypatch):
+    monkeypatch.setattr(storage_utils, "STORAGE_QUOTA_BYTES", 100)
+    reached_endpoint = []
+
+    def get_storage_usage_in_endpoint(*args, **kwargs):
+        reached_endpoint.append(True)
+        return get_storage_usage(*args, **kwargs)
+
+    monkeypatch.setattr(file_system, "get_storage_usage", get_storage_usage_in_endpoint)
+
+    response = upload(client, "big.docx", b"x" * (100 + file_system.MULTIPART_FRAMING_ALLOWANCE))
+    assert response.status_code == 413
+    assert reached_endpoint == []
+    assert usage_of(db) == (0, 0)
+    assert os.listdir(upload_dir) == []
+
+
+def test_upload_filling_byte_quota_exactly_is_accepted(client, db, upload_dir, monkeypatch):
+    monkeypatch.setattr(storage_utils, "STORAGE_QUOTA_BYTES", 100)
+
+    response = upload(client, "exact.docx", b"x" * 100)
+    assert response.status_code == 200
+    assert usage_of(db) == (100, 1)
+    assert os.listdir(upload_dir) == ["exact.docx"]
+
+
+def test_upload_over_byte_quota_is_rejected_while_writing(client, db, upload_dir, monkeypatch):
+    # The declared length passes the middleware allowance, the endpoint's chunked check stops it
+    monkeypatch.setattr(storage_utils, "STORAGE_QUOTA_BYTES", 100)
+
+    response = upload(client, "big.docx", b"x" * 101)
+    assert response.status_code == 413
+    assert usage_of(db) == (0, 0)
+    assert os.listdir(upload_dir) == []
+
+
+def test_upload_over_byte_quota_is_rejected_under_row_lock(client, db, upload_dir, monkeypatch):
+    monkeypatch.setattr(storage_utils, "STORAGE_QUOTA_BYTES", 100)
+
+    def get_storage_usage_after_concurrent_upload(session, user_id, lock=False):
+        # Simulate another upload of the same user committing while this file was being written
+        if lock:
+            concurrent = get_storage_usage(session, user_id)
+            record_upload(concurrent, 60)
+            session.commit()
+        return get_storage_usage(session, user_id, lock=lock)
+
+    monkeypatch.setattr(file_system, "get_storage_usage", get_storage_usage_after_concurrent_upload)
+
+    response = upload(client, "report.docx", b"x" * 50)
+    assert response.status_code == 413
+    assert usage_of(db) == (60, 1)
+    assert db.query(Files).count() == 0
+    assert os.listdir(upload_dir) == []
+
+
+def test_upload_over_file_count_quota_is_rejected(client, db, upload_dir, monkeypatch):
+    monkeypatch.setattr(storage_utils, "STORAGE_QUOTA_FILES", 1)
+
+    assert upload(client, "first.docx", b"x").status_code == 200
+    response = upload(client, "second.docx", b"y")
+    assert response.status_code == 413
+    assert usage_of(db) == (1, 1)
+    assert os.listdir(upload_dir) == ["first.docx"]
+
+
+def test_client_upload_over_quota_is_forbidden(client, db, monkeypatch):
+    monkeypatch.setattr(storage_utils, "STORAGE_QUOTA_BYTES", 1)
+
+    response = upload(client, "big.docx", b"x" * 200, email=CLIENT_EMAIL)
+    assert response.status_code == 403
+
+
+def test_failed_upload_leaves_usage_and_stored_file_unchanged(db, upload_dir):
+    client = TestClient(create_app(), raise_server_exceptions=False)
+    assert upload(client, "report.docx", b"original").status_code == 200
+
+    # The same name maps to the same unique encrypted_url, so the commit fails
+    response = upload(client, "report.docx", b"replacement")
+    assert response.status_code == 500
+    assert usage_of(db) == (8, 1)
+    assert (upload_dir / "report.docx").read_bytes() == b"original"
+    assert os.listdir(upload_dir) == ["report.docx"]
@@ -1,14 +1,31 @@
 import os
+import ssl
 import base64
 import smtplib
 from email.message import EmailMessage
 
-from dotenv import load_dotenv
-load_dotenv()
-
 SENDER_USER_EMAIL = os.getenv("SENDER_USER_EMAIL", "test@gmail.com")
 SENDER_USER_PASSWORD = os.getenv("SENDER_USER_PASSWORD", "umjn bzqs zggd nzrm")
 
+_smtp_ssl_context = None
+
+
+def init_smtp() -> ssl.SSLContext:
+    """
+    Create the SSL context used for SMTP connections on first use.
+
+    Loading the CA certificates is the expensive part of setting up SMTP over SSL, so it is done
+    once per worker (at startup) instead of on every email. The SMTP connection itself is still
+    opened per email because the mail server drops idle connections.
+
+    Returns:
+        ssl.SSLContext: The shared SSL context.
+    """
+    global _smtp_ssl_context
+    if _smtp_ssl_context is None:
+        _smtp_ssl_context = ssl.create_default_context()
+    return _smtp_ssl_context
+
 
 def send_verification_email(email: str, verification_url: str):
     """
@@ -34,7 +51,7 @@ def send_verification_email(email: str, verification_url: str):
     msg["Subject"] = "Email Verification"
     msg.set_content(f"Please verify your email by clicking on this link: {verification_url}")
 
-    with smtplib.SMTP_SSL('smtp.gmail.com', 465) as smtp:
+    with smtplib.SMTP_SSL('smtp.gmail.com', 465, context=init_smtp()) as smtp:
         smtp.login(SENDER_USER_EMAIL,SENDER_USER_PASSWORD)
         smtp.send_message(msg)
         